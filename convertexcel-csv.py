@@ -1,25 +1,39 @@
-import openpyxl
+from python_calamine import CalamineWorkbook
 import csv
+from datetime import date, datetime, time
 
-def excel_to_csv(excel_file):
-    # Load the Excel workbook
-    wb = openpyxl.load_workbook(excel_file)
+def cell_value(value):
+    """Convert a calamine cell value to what openpyxl returned for the same cell"""
+    # calamine returns every number as a float; write whole numbers as ints (1, not 1.0)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    # Date-only cells come back as date; openpyxl gave a datetime at midnight
+    if type(value) is date:
+        return datetime.combine(value, time())
+    return value
 
-    # Loop through all sheets in the workbook
-    for sheet_name in wb.sheetnames:
-        sheet = wb[sheet_name]
+def excel_to_csv(excel_file):
+    # Load the Excel workbook (parsed natively by calamine); closing it releases the file
+    with CalamineWorkbook.from_path(excel_file) as wb:
+        # Loop through all sheets in the workbook
+        for sheet_name in wb.sheet_names:
+            # Keep leading empty rows/columns, as openpyxl did
+            rows = wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+        
+            # Match openpyxl's output for numbers and dates
+            rows = ([cell_value(v) for v in row] for row in rows)
         
-        # Open a CSV file to write the sheet content
-        csv_file_name = f"{sheet_name}.csv"
+            # Open a CSV file to write the sheet content
+            csv_file_name = f"{sheet_name}.csv"
         
-        with open(csv_file_name, mode='w', newline="", encoding='utf-8') as file:
-            writer = csv.writer(file)
+            # Use a 1 MiB buffer so rows are flushed to disk in large writes
+            with open(csv_file_name, mode='w', newline="", encoding='utf-8', buffering=1 << 20) as file:
+                writer = csv.writer(file)
             
-            # Write rows from the Excel sheet to CSV
-            for row in sheet.iter_rows(values_only=True):
-                writer.writerow(row)
+                # Write rows from the Excel sheet to CSV
+                writer.writerows(rows)
 
-        print(f"Sheet '{sheet_name}' has been saved as {csv_file_name}")
+            print(f"Sheet '{sheet_name}' has been saved as {csv_file_name}")
 
 # Example usage
 excel_file = r'D:\Inventory\Updated Inventory_Device_Count_2025.xlsx'  # Provide the path to your Excel file
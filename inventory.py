@@ -1,10 +1,14 @@
 import csv
+import re
 import requests
+import aiohttp
+import asyncio
 import logging
-import json
-import pandas as pd
+import orjson
 from datetime import datetime
 import io
+import itertools
+from collections import namedtuple
 
 # Configure logging
 logging.basicConfig(
@@ -14,69 +18,103 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def clean_csv(input_file, output_file):
+# Inventory columns, in the order they appear in the CSV
+INVENTORY_COLUMNS = ['Sl.no', 'Team', 'Device model', 'S/N', 'MAC ID', 'Condition', 'Assigned to', 'Owner']
+
+# A cleaned inventory row, with the columns above renamed to valid identifiers
+Device = namedtuple('Device', ['sl_no', 'team', 'device_model', 's_n', 'mac_id', 'condition', 'assigned_to', 'owner'])
+
+# Runs of whitespace collapsed to a single space when cleaning cells
+_WS_RE = re.compile(r'\s+')
+
+# Values used for columns that are empty after cleaning
+INVENTORY_DEFAULTS = {
+    'Device model': 'Unknown Device',
+    'S/N': 'UNKNOWN',
+    'MAC ID': 'UNKNOWN',
+    'Owner': 'Unassigned',
+    'Team': 'Inventory',
+    'Condition': 'Unknown',
+    'Assigned to': 'Unassigned'
+}
+
+# Characters that are not allowed in a Zabbix hostname
+_HOSTNAME_INVALID_RE = re.compile(r'[^\w.-]')
+
+def clean_csv(input_file):
     """
-    Clean and preprocess the input CSV file
+    Read, clean and preprocess the input CSV file in a single pass
     
     Args:
         input_file (str): Path to the input CSV file
-        output_file (str): Path to save the cleaned CSV file
     
     Returns:
-        pd.DataFrame or None: Cleaned DataFrame if successful, None otherwise
+        list or None: Cleaned device records if successful, None otherwise
     """
     try:
-        # Read the file manually to understand its structure
-        with open(input_file, 'r') as file:
-            # Peek at the first few lines
-            logger.info("First few lines of the file:")
-            for _ in range(5):
-                logger.info(file.readline().strip())
-            file.seek(0)  # Reset file pointer 
+        devices = list(iter_inventory_csv(input_file))
         
-        # Use csv reader to handle problematic lines
-        with open(input_file, 'r') as file:
-            csv_reader = csv.reader(file)
-            cleaned_rows = []
-            
-            for row in csv_reader:
-                # Filter out completely empty rows
-                if any(cell.strip() for cell in row):
-                    # Trim whitespace from each cell
-                    cleaned_row = [cell.strip() for cell in row]
-                    # Take only first 8 columns
-                    cleaned_row = cleaned_row[:8]
-                    cleaned_rows.append(cleaned_row)
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(cleaned_rows[1:], columns=cleaned_rows[0][:8])
-            
-            # Additional cleaning
-            df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-            
-            # Remove rows with all empty values
-            df = df.dropna(how='all')
-            
-            # Save cleaned CSV
-            df.to_csv(output_file, index=False)
-            
-            logger.info(f"Cleaned CSV contains {len(df)} rows")
-            logger.info("First few rows of cleaned CSV:")
-            logger.info(str(df.head()))
-            
-            return df
+        logger.info(f"Cleaned CSV contains {len(devices)} rows")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("First few rows of cleaned CSV:\n%s", '\n'.join(map(str, devices[:5])))
+        
+        return devices
     
     except Exception as e:
         logger.error(f"Error processing CSV: {e}")
         return None
 
+def iter_inventory_csv(file_path):
+    """Stream cleaned Device records from an inventory CSV file, one per row"""
+    # utf-8-sig drops the BOM Excel writes on "CSV UTF-8" exports and reads plain UTF-8 unchanged
+    with open(file_path, newline='', encoding='utf-8-sig') as file:
+        # Name the first 8 columns ourselves; the file's own header is skipped below
+        reader = csv.DictReader(file, fieldnames=INVENTORY_COLUMNS)
+        header_seen = False
+
+        for raw in reader:
+            # Log the first few rows as they are read instead of re-reading the file
+            if reader.line_num <= 5 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Line {reader.line_num}: {list(raw.values())}")
+            row = clean_row(raw)
+            if row is None:
+                continue
+            # The first non-empty row is the header, even if blank rows come before it
+            if not header_seen:
+                header_seen = True
+                continue
+            yield row
+
+def clean_row(raw):
+    """Normalize whitespace and fill defaults for one row, returning a Device or None if it is empty"""
+    row = {col: _WS_RE.sub(' ', raw.get(col) or '').strip() for col in INVENTORY_COLUMNS}
+
+    # Skip rows that are completely empty after cleaning
+    if not any(row.values()):
+        return None
+
+    # Fill empty values with defaults while building the record
+    return Device(*(row[col] or INVENTORY_DEFAULTS.get(col, '') for col in INVENTORY_COLUMNS))
+
 class ZabbixInventoryManager:
     def __init__(self, zabbix_url='zabbix url', username='Admin', password='zabbix_password'):
         self.api_url = f"{zabbix_url}/api_jsonrpc.php"
         self.headers = {"Content-Type": "application/json-rpc"}
+        self.session = requests.Session()  # Keep-alive connection pool for login and group/host lookups
+        self.session.headers.update(self.headers)
+        self.request_ids = itertools.count(1)  # Unique JSON-RPC ids so batched responses can be matched
         self.auth_token = self.get_zabbix_token(username, password)
+        # host.create request with a fixed envelope; only the per-host fields are encoded per call
+        self._create_tpl = (
+            b'{"jsonrpc":"2.0","method":"host.create","params":{'
+            b'"host":%b,"groups":[{"groupid":%b}],"inventory_mode":1,"inventory":{'
+            b'"type":%b,"serialno_a":%b,"macaddress_a":%b,"location":%b,'
+            b'"notes":%b,"site_notes":%b,"contact":%b}},'
+            b'"auth":' + orjson.dumps(self.auth_token).replace(b'%', b'%%') + b',"id":%b}'
+        )
         self.counter = 1  # Initialize counter for devices without S/N and MAC
         self.hostname_counters = {}  # Track hostname counts for duplicates
+        self._group_id_cache = {}  # Team name -> group ID, so each group is looked up once
 
     def generate_unique_hostname(self, base_hostname):
         """Generate a unique hostname by adding a number suffix if needed"""
@@ -97,18 +135,17 @@ class ZabbixInventoryManager:
                 "username": username,
                 "password": password
             },
-            "id": 1
+            "id": next(self.request_ids)
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                data=json.dumps(payload),
-                headers=self.headers
+                data=orjson.dumps(payload)
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if 'result' in result:
                     logger.info("Successfully authenticated with Zabbix API")
                     return result['result']
@@ -120,56 +157,11 @@ class ZabbixInventoryManager:
             logger.error(f"Error getting Zabbix token: {e}")
             return None
 
-    def read_inventory_csv(self, file_path):
-        """Read and clean inventory CSV file with enhanced space and data handling"""
-        try:
-            # Read CSV with pandas, specifying only the first 8 columns
-            df = pd.read_csv(file_path, usecols=range(8), dtype=str)
-            
-            # Clean column names
-            df.columns = ['Sl.no', 'Team', 'Device model', 'S/N', 'MAC ID', 'Condition', 'Assigned to', 'Owner']
-            
-            # Enhanced cleaning function
-            def clean_value(value):
-                """Clean and validate individual values"""
-                if pd.isna(value):
-                    return ''
-                # Remove all types of whitespace and normalize
-                cleaned = ' '.join(str(value).split())
-                return cleaned if cleaned else ''
-            
-            # Apply cleaning to all columns
-            for col in df.columns:
-                df[col] = df[col].apply(clean_value)
-            
-            # Specific handling for critical fields
-            df['Device model'] = df['Device model'].apply(lambda x: x if x else 'Unknown Device')
-            df['S/N'] = df['S/N'].apply(lambda x: x if x else 'UNKNOWN')
-            df['MAC ID'] = df['MAC ID'].apply(lambda x: x if x else 'UNKNOWN')
-            
-            # Fill remaining empty values with defaults
-            defaults = {
-                'Owner': 'Unassigned',
-                'Team': 'Inventory',
-                'Condition': 'Unknown',
-                'Assigned to': 'Unassigned'
-            }
-            
-            for col, default in defaults.items():
-                df[col] = df[col].apply(lambda x: x if x else default)
-            
-            # Remove rows that are completely empty after cleaning
-            df = df[df.apply(lambda row: any(row.str.strip() != ''), axis=1)]
-
-            logger.info(f"Successfully read {len(df)} devices from CSV")
-            return df
-
-        except Exception as e:
-            logger.error(f"Error reading CSV file: {str(e)}")
-            return None
-
     def get_group_id(self, group_name):
         """Get or create host group"""
+        if group_name in self._group_id_cache:
+            return self._group_id_cache[group_name]
+        
         payload = {
             "jsonrpc": "2.0",
             "method": "hostgroup.get",
@@ -177,25 +169,26 @@ class ZabbixInventoryManager:
                 "filter": {"name": group_name}
             },
             "auth": self.auth_token,
-            "id": 1
+            "id": next(self.request_ids)
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                data=json.dumps(payload),
-                headers=self.headers
+                data=orjson.dumps(payload)
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if result.get('result'):
                     group_id = result['result'][0]['groupid']
                     logger.info(f"Found existing group '{group_name}' with ID {group_id}")
-                    return group_id
                 else:
                     # Create group if it doesn't exist
-                    return self.create_group(group_name)
+                    group_id = self.create_group(group_name)
+                if group_id:
+                    self._group_id_cache[group_name] = group_id
+                return group_id
             
             logger.error(f"Failed to get group ID for {group_name}")
             return None
@@ -204,6 +197,47 @@ class ZabbixInventoryManager:
             logger.error(f"Error getting group ID: {e}")
             return None
 
+    def resolve_groups(self, group_names):
+        """Fetch the IDs of all groups in one call and create any that are missing"""
+        group_names = [name for name in group_names if name not in self._group_id_cache]
+        if not group_names:
+            return
+        
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "hostgroup.get",
+            "params": {
+                "output": ["groupid", "name"],
+                "filter": {"name": group_names}
+            },
+            "auth": self.auth_token,
+            "id": next(self.request_ids)
+        }
+        
+        try:
+            response = self.session.post(
+                self.api_url,
+                data=orjson.dumps(payload)
+            )
+            
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                if 'result' in result:
+                    for group in result['result']:
+                        self._group_id_cache[group['name']] = group['groupid']
+                    logger.info(f"Found {len(result['result'])} existing groups")
+                else:
+                    logger.error(f"Failed to prefetch group IDs: {result.get('error', 'Unknown error')}")
+            else:
+                logger.error(f"Failed to prefetch group IDs: {response.text}")
+                
+        except Exception as e:
+            logger.error(f"Error prefetching group IDs: {e}")
+        
+        # Look up or create whatever the prefetch did not return
+        for group_name in group_names:
+            self.get_group_id(group_name)
+
     def create_group(self, group_name):
         """Create a new host group"""
         payload = {
@@ -213,18 +247,17 @@ class ZabbixInventoryManager:
                 "name": group_name
             },
             "auth": self.auth_token,
-            "id": 1
+            "id": next(self.request_ids)
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                data=json.dumps(payload),
-                headers=self.headers
+                data=orjson.dumps(payload)
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if 'result' in result:
                     group_id = result['result']['groupids'][0]
                     logger.info(f"Created new group '{group_name}' with ID {group_id}")
@@ -237,67 +270,123 @@ class ZabbixInventoryManager:
             logger.error(f"Error creating group: {e}")
             return None
 
-    def create_or_update_host(self, host_data):
-        """Create new host in Zabbix"""
-        try:
-            # Generate identifier
-            identifier = self.generate_identifier(host_data['S/N'], host_data['MAC ID'])
-            base_hostname = f"{str(host_data['Device model']).replace(' ', '-')}-{identifier}"
-            # Ensure hostname is valid (remove special characters)
-            base_hostname = ''.join(c for c in base_hostname if c.isalnum() or c in '-_.')
-            
-            # Generate unique hostname
-            hostname = self.generate_unique_hostname(base_hostname)
-            
-            group_id = self.get_group_id(str(host_data['Team']).strip())
-            
-            if not group_id:
-                logger.error(f"Failed to get/create group for {host_data['Team']}")
-                return False
-            
-            # Create new host (don't check for existing)
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "host.create",
-                "params": {
-                    "host": hostname,
-                    "groups": [{"groupid": group_id}],
-                    "inventory_mode": 1,
-                    "inventory": {
-                        "type": str(host_data['Device model']),
-                        "serialno_a": str(host_data['S/N']),
-                        "macaddress_a": str(host_data['MAC ID']),
-                        "location": str(host_data['Assigned to']),
-                        "notes": str(host_data['Condition']),
-                        "site_notes": str(host_data['Team']),
-                        "contact": str(host_data['Owner'])
-                    }
-                },
-                "auth": self.auth_token,
-                "id": 1
-            }
-            
-            response = requests.post(
-                self.api_url,
-                data=json.dumps(payload),
-                headers=self.headers
-            )
+    def build_host_payload(self, host_data):
+        """
+        Build the encoded host.create request for a device
+        
+        Args:
+            host_data (Device): Cleaned device record
+        
+        Returns:
+            tuple or None: (request id, hostname, JSON body) if successful, None if the group is unavailable
+        """
+        # Generate identifier
+        identifier = self.generate_identifier(host_data.s_n, host_data.mac_id)
+        base_hostname = f"{host_data.device_model.replace(' ', '-')}-{identifier}"
+        # Ensure hostname is valid (remove special characters)
+        base_hostname = _HOSTNAME_INVALID_RE.sub('', base_hostname)
+        
+        # Generate unique hostname
+        hostname = self.generate_unique_hostname(base_hostname)
+        
+        group_id = self.get_group_id(host_data.team)
+        
+        if not group_id:
+            logger.error(f"Failed to get/create group for {host_data.team}")
+            return None
+        
+        # Create new host (don't check for existing)
+        request_id = next(self.request_ids)
+        body = self._create_tpl % (
+            orjson.dumps(hostname),
+            orjson.dumps(group_id),
+            orjson.dumps(host_data.device_model),
+            orjson.dumps(host_data.s_n),
+            orjson.dumps(host_data.mac_id),
+            orjson.dumps(host_data.assigned_to),
+            orjson.dumps(host_data.condition),
+            orjson.dumps(host_data.team),
+            orjson.dumps(host_data.owner),
+            orjson.dumps(request_id)
+        )
+        return request_id, hostname, body
+
+    def create_hosts_bulk(self, hosts, batch_size=100, max_concurrency=16):
+        """
+        Create many hosts using batched JSON-RPC requests
+        
+        Args:
+            hosts (iterable): Cleaned Device records
+            batch_size (int): Number of host.create calls sent per HTTP request
+            max_concurrency (int): Maximum number of batches in flight at once
+        
+        Returns:
+            int: Number of hosts created successfully
+        """
+        # Hostnames and payloads are built up front, off the network path
+        payloads = [self.build_host_payload(host) for host in hosts]
+        payloads = [payload for payload in payloads if payload is not None]
+        
+        batches = [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+        return asyncio.run(self.send_host_batches(batches, max_concurrency))
+
+    async def send_host_batches(self, batches, max_concurrency):
+        """Send all batches concurrently over one aiohttp session and return how many hosts were created"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        connector = aiohttp.TCPConnector(limit=max_concurrency, keepalive_timeout=60)
+        
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers) as session:
+            async def send(batch):
+                async with semaphore:
+                    return await self.send_host_batch(session, batch)
             
-            if response.status_code == 200:
-                result = response.json()
+            results = await asyncio.gather(*(send(batch) for batch in batches))
+        
+        return sum(results)
+
+    async def _post(self, session, body):
+        """POST an encoded JSON-RPC body and return the HTTP status with the decoded response (or raw text on failure)"""
+        async with session.post(self.api_url, data=body) as response:
+            if response.status != 200:
+                return response.status, await response.text()
+            return response.status, orjson.loads(await response.read())
+
+    async def send_host_batch(self, session, batch):
+        """Send one JSON-RPC batch of host.create calls and return how many succeeded"""
+        hostnames = {request_id: hostname for request_id, hostname, _ in batch}
+        
+        try:
+            status, results = await self._post(session, b'[' + b','.join(body for _, _, body in batch) + b']')
+            
+            if status != 200:
+                logger.error(f"Failed to create batch of {len(batch)} hosts: {results}")
+                logger.error(f"Failed to create hosts {', '.join(hostnames.values())}")
+                return 0
+            
+            if not isinstance(results, list):
+                logger.error(f"Failed to create batch of {len(batch)} hosts: {results.get('error', 'Unknown error')}")
+                logger.error(f"Failed to create hosts {', '.join(hostnames.values())}")
+                return 0
+            
+            created = 0
+            pending = dict(hostnames)
+            for result in results:
+                hostname = pending.pop(result.get('id'), 'unknown host')
                 if 'result' in result:
                     logger.info(f"Successfully created host {hostname}")
-                    return True
+                    created += 1
                 else:
                     logger.error(f"Failed to create host {hostname}: {result.get('error', 'Unknown error')}")
-                    return False
             
-            logger.error(f"Failed to create host {hostname}: {response.text}")
-            return False
+            # Requests the server did not answer were not created either
+            for hostname in pending.values():
+                logger.error(f"Failed to create host {hostname}: no response in batch")
+            return created
             
         except Exception as e:
-            logger.error(f"Error creating host: {e}")
-            return False
+            logger.error(f"Error creating batch of {len(batch)} hosts: {e}")
+            logger.error(f"Failed to create hosts {', '.join(hostnames.values())}")
+            return 0
 
     def generate_identifier(self, serial_number, mac_address):
         """Generate a unique identifier for the device"""
@@ -320,18 +409,17 @@ class ZabbixInventoryManager:
                 "filter": {"host": hostname}
             },
             "auth": self.auth_token,
-            "id": 1
+            "id": next(self.request_ids)
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                data=json.dumps(payload),
-                headers=self.headers
+                data=orjson.dumps(payload)
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if result.get('result'):
                     return result['result'][0]['hostid']
             return None
@@ -342,14 +430,12 @@ class ZabbixInventoryManager:
 
 def main():
     try:
-        # Clean the input CSV first
-        cleaned_csv_path = 'cleaned_sending.csv' # u can change this as u want 
         raw_csv_path = 'sending.csv' # enter the correct csv where u have the details 
         
-        # Clean the CSV
-        cleaned_df = clean_csv(raw_csv_path, cleaned_csv_path)
+        # Read and clean the CSV in a single pass
+        devices = clean_csv(raw_csv_path)
         
-        if cleaned_df is None:
+        if devices is None:
             logger.error("Failed to clean CSV file")
             return
         
@@ -360,30 +446,18 @@ def main():
             logger.error("Failed to authenticate with Zabbix")
             return
         
-        # Read inventory data from cleaned CSV
-        inventory_data = manager.read_inventory_csv(cleaned_csv_path)
-        if inventory_data is None:
-            logger.error("Failed to read inventory data")
-            return
+        total_count = len(devices)
         
-        success_count = 0
-        failed_count = 0
-        total_count = len(inventory_data)
+        # Resolve every team's group once up front, before any host.create batch is sent
+        manager.resolve_groups({device.team for device in devices})
         
-        # Process each device
-        for _, row in inventory_data.iterrows():
-            if manager.create_or_update_host(row):
-                success_count += 1
-            else:
-                failed_count += 1
+        # Create all devices with batched JSON-RPC requests
+        success_count = manager.create_hosts_bulk(devices)
+        failed_count = total_count - success_count
                 
         logger.info(f"Processing complete. Successfully processed {success_count} out of {total_count} devices")
         if failed_count > 0:
             logger.warning(f"Failed to process {failed_count} devices. Check logs for details.")
-        
-        # Optionally, remove the cleaned CSV after processing
-        import os
-        os.remove(cleaned_csv_path)
             
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")